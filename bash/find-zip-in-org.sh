@@ -39,15 +39,8 @@ echo "========================================"
 for PROJECT_ID in $PROJECT_IDS
 do
   echo "--- Project: $PROJECT_ID ---"
-  # Set the active project for gsutil commands
-  gcloud config set project "$PROJECT_ID" > /dev/null 2>&1
-  if [ $? -ne 0 ]; then
-    echo "Warning: Failed to set project $PROJECT_ID. Skipping."
-    continue
-  fi
-
-  # List all buckets in the current project
-  BUCKETS=$(gsutil ls 2>/dev/null)
+  # List all buckets in the project (passing -p avoids mutating the global gcloud config)
+  BUCKETS=$(gsutil ls -p "$PROJECT_ID" 2>/dev/null)
   if [ -z "$BUCKETS" ]; then
     echo "  No buckets found in project $PROJECT_ID or insufficient permissions to list them."
   else
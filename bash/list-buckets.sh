@@ -33,13 +33,9 @@ echo "------------------------------------"
 for PROJECT_ID in $PROJECT_IDS
 do
   echo "Buckets in project: $PROJECT_ID"
-  # gcloud storage ls --project="$PROJECT_ID"
-  # Using gsutil as gcloud storage ls --project is not the standard way,
-  # and gsutil ls is more common for listing buckets within a specific project context.
-  # Note: gsutil will use the currently active project if --project is not available for `ls` directly.
-  # To ensure we list for the correct project, we can set the project for each iteration.
-  gcloud config set project "$PROJECT_ID" > /dev/null 2>&1
-  gsutil ls
+  # Pass the project to gsutil directly rather than running `gcloud config set project`,
+  # which rewrites the global gcloud configuration on every iteration.
+  gsutil ls -p "$PROJECT_ID"
   echo "------------------------------------"
 done
 
@@ -1,204 +1,305 @@
 #!/usr/bin/env python3
 
 import argparse
+from collections import Counter, defaultdict
 import csv
 from datetime import datetime
 import os
 import sys
-from typing import List, Dict, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor
-import subprocess
+from typing import Callable, List, Dict, Optional, Set, Tuple
+from itertools import islice
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 import json
+import logging
+import threading
+import time
+import google.auth
+import google.auth.exceptions
+import google.auth.transport.requests
+from google.api_core import exceptions
+from google.api_core.retry import Retry, if_transient_error
+from google.cloud import asset_v1, storage
+from google.cloud.storage.retry import DEFAULT_RETRY
+from requests.adapters import HTTPAdapter
+
+# Bucket listings are I/O-bound, so run well beyond the core count
+DEFAULT_PARALLELISM = max(64, (os.cpu_count() or 1) * 8)
+DEFAULT_SKIPPED_BUCKETS = ["gs://angels-bbops-video-dr/"]
+DEFAULT_CHECKPOINT_FILE = "scanned_projects.txt"
+CSV_FIELDNAMES = ['project_id', 'bucket_url', 'file_type', 'file_path']
+# Completed projects are synced to disk and checkpointed in batches, whichever limit is hit first
+CHECKPOINT_BATCH_SIZE = 100
+CHECKPOINT_INTERVAL_SECONDS = 5.0
+
+logger = logging.getLogger(__name__)
 
 class ArchiveFileFinder:
-    def __init__(self, organization_id: str, output_file: Optional[str] = None):
+    def __init__(self, organization_id: str, output_file: Optional[str] = None,
+                 parallelism: int = DEFAULT_PARALLELISM, prefixes: Optional[List[str]] = None,
+                 skip_buckets: Optional[List[str]] = None, max_pages: Optional[int] = None,
+                 resume: bool = False, checkpoint_file: str = DEFAULT_CHECKPOINT_FILE):
         self.organization_id = organization_id
-        self.output_file = output_file or f"archive_files_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        self.errors_file = f"permission_errors_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-        self.skipped_bucket = "gs://angels-bbops-video-dr/"
+        self.parallelism = parallelism
+        # Drop prefixes nested under another listed prefix so no object is listed twice
+        unique_prefixes = sorted(set(prefixes or ['']))
+        self.prefixes = [
+            p for p in unique_prefixes
+            if not any(p != other and p.startswith(other) for other in unique_prefixes)
+        ]
+        self.max_pages = max_pages
+        self.resume = resume
+        self.checkpoint_file = checkpoint_file
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.output_file = output_file or f"archive_files_{timestamp}.csv"
+        self.errors_file = f"permission_errors_{timestamp}.txt"
+        self.skipped_buckets = {
+            self._bucket_url(bucket)
+            for bucket in (DEFAULT_SKIPPED_BUCKETS if skip_buckets is None else skip_buckets)
+        }
         self.archive_types = ['.zip', '.tar', '.tar.gz', '.gz']
-        
+        # Longest suffix first so a .tar.gz is classified once as tar.gz, never as gz
+        self._ext_tuple = tuple(sorted(self.archive_types, key=len, reverse=True))
+        self._file_types = {ext: ext[1:] for ext in self._ext_tuple}  # Remove the dot
+        self._filter = self._make_filter(self._ext_tuple, self._file_types)
+        # A single brace glob lets GCS filter every extension server-side in one listing
+        self._match_glob = "**{" + ",".join(self.archive_types) + "}"
+        # One credential shared by every client so tokens are fetched and refreshed once per run
+        self.credentials, default_project = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
+        # Size the HTTP connection pool to the worker pool so threads don't churn connections
+        session = google.auth.transport.requests.AuthorizedSession(self.credentials)
+        adapter = HTTPAdapter(pool_connections=self.parallelism, pool_maxsize=self.parallelism)
+        session.mount("https://", adapter)
+        self.storage_client = storage.Client(project=default_project, credentials=self.credentials, _http=session)
+        self.asset_client = asset_v1.AssetServiceClient(credentials=self.credentials)
+        self._writer: Optional[csv.DictWriter] = None
+        self._writer_lock = threading.Lock()
+        self._asset_buckets: Dict[str, List[str]] = {}
+        # Dict keys keep insertion order while giving O(1) membership checks
+        self._permission_errors: Dict[str, None] = {}
+        self._errors_lock = threading.Lock()
+        # Storage calls use the library's DEFAULT_RETRY; this policy covers the Cloud Asset searches
+        self.retry = Retry(predicate=if_transient_error, initial=1.0, maximum=30.0, timeout=300.0)
+
     def check_auth(self) -> bool:
-        """Check if user is authenticated with gcloud."""
+        """Check that the application default credentials can obtain an access token."""
         try:
-            result = subprocess.run(
-                ["gcloud", "auth", "list", "--filter=status:ACTIVE", "--format=value(account)"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            if not result.stdout.strip():
-                print("Error: No active gcloud account found. Please run 'gcloud auth login' first.", file=sys.stderr)
-                return False
-            print(f"Using account: {result.stdout.strip()}")
-            return True
-        except subprocess.CalledProcessError as e:
-            print(f"Error checking authentication: {e.stderr}", file=sys.stderr)
+            self.credentials.refresh(google.auth.transport.requests.Request())
+        except google.auth.exceptions.RefreshError as e:
+            print(f"Error checking authentication: {e}", file=sys.stderr)
+            print("Please run 'gcloud auth application-default login' first.", file=sys.stderr)
             return False
-
-    def run_gcloud_command(self, command: List[str]) -> Tuple[str, bool]:
-        """Run a gcloud command and return its output and success status."""
-        try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return result.stdout.strip(), True
-        except subprocess.CalledProcessError as e:
-            return e.stderr, False
+        account = getattr(self.credentials, 'service_account_email', None) or getattr(self.credentials, 'account', None)
+        print(f"Using account: {account or 'application default credentials'}")
+        return True
 
     def get_projects(self) -> List[str]:
         """Get all projects in the organization."""
         print(f"Fetching projects in organization: {self.organization_id}...")
-        command = [
-            "gcloud", "asset", "search-all-resources",
-            f"--scope=organizations/{self.organization_id}",
-            "--asset-types=cloudresourcemanager.googleapis.com/Project",
-            "--format=value(name.basename())",
-            "--quiet"
-        ]
-        projects, success = self.run_gcloud_command(command)
-        if not success or not projects:
+        try:
+            results = self.asset_client.search_all_resources(
+                request={
+                    "scope": f"organizations/{self.organization_id}",
+                    "asset_types": ["cloudresourcemanager.googleapis.com/Project"],
+                },
+                retry=self.retry
+            )
+            projects = [result.name.split('/')[-1] for result in results]
+        except exceptions.GoogleAPIError as e:
+            print(f"Error searching organization {self.organization_id}: {str(e)}", file=sys.stderr)
+            projects = []
+        if not projects:
             print("No projects found. Please ensure you have the following permissions:")
             print("- roles/asset.viewer")
             print("- roles/cloudasset.viewer")
             print("- roles/resourcemanager.organizationViewer")
             sys.exit(1)
-        return [p for p in projects.split('\n') if p]
+        return projects
+
+    def get_all_buckets_via_asset(self) -> Dict[str, List[str]]:
+        """Get every bucket in the organization in one Cloud Asset search, grouped by project."""
+        print(f"Fetching buckets in organization: {self.organization_id}...")
+        buckets_by_project: Dict[str, List[str]] = defaultdict(list)
+        try:
+            results = self.asset_client.search_all_resources(
+                request={
+                    "scope": f"organizations/{self.organization_id}",
+                    "asset_types": ["storage.googleapis.com/Bucket"],
+                    "read_mask": {"paths": ["name", "project"]},
+                },
+                retry=self.retry
+            )
+            for result in results:
+                buckets_by_project[result.project.split('/')[-1]].append(
+                    self._bucket_url(result.name.split('/')[-1])
+                )
+        except exceptions.GoogleAPIError as e:
+            logger.warning("Error searching buckets in organization %s, listing per project instead: %s",
+                           self.organization_id, e)
+            return {}
+        return dict(buckets_by_project)
 
     def get_buckets(self, project_id: str) -> Tuple[List[str], bool]:
         """Get all buckets in a project. Returns (buckets, has_permission)."""
         try:
-            # First check if we can set the project
-            _, success = self.run_gcloud_command(["gcloud", "config", "set", "project", project_id])
-            if not success:
-                return [], False
-
-            # Then check if we can list buckets
-            buckets, success = self.run_gcloud_command(["gsutil", "ls"])
-            if not success:
-                return [], False
-
-            bucket_list = [b for b in buckets.split('\n') if b and b.endswith('/')]
+            buckets = self.storage_client.list_buckets(project=project_id, retry=DEFAULT_RETRY)
+            bucket_list = [f"gs://{bucket.name}/" for bucket in buckets]
             print(f"  Found {len(bucket_list)} buckets in project {project_id}")
             for bucket in bucket_list:
-                print(f"    Bucket: {bucket}")
+                logger.debug("    Bucket: %s", bucket)
             return bucket_list, True
+        except (exceptions.Forbidden, exceptions.NotFound) as e:
+            print(f"  Cannot list buckets for project {project_id}: {e.message}")
+            return [], False
         except Exception as e:
             print(f"  Error getting buckets for project {project_id}: {str(e)}")
             return [], False
 
-    def search_bucket(self, bucket_url: str) -> List[Dict[str, str]]:
-        """Search a bucket for archive files."""
-        if bucket_url == self.skipped_bucket:
-            print(f"Skipping bucket: {bucket_url}")
-            return []
+    @staticmethod
+    def _make_filter(exts: Tuple[str, ...], file_types: Dict[str, str]) -> Callable[[str], Optional[str]]:
+        """Build a closure returning the archive type of a blob name, or None if it isn't an archive."""
+        def _f(name: str, _e: Tuple[str, ...] = exts, _t: Dict[str, str] = file_types) -> Optional[str]:
+            if not name.endswith(_e):
+                return None
+            for ext in _e:
+                if name.endswith(ext):
+                    return _t[ext]
+            return None
+        return _f
 
-        # Special handling for the known bucket
+    @staticmethod
+    def _bucket_name(bucket_url: str) -> str:
+        """Strip the gs:// scheme and trailing slash from a bucket URL."""
+        return bucket_url[len("gs://"):].rstrip('/')
+
+    @staticmethod
+    def _bucket_url(bucket: str) -> str:
+        """Normalize a bucket name or URL to the gs://bucket/ form."""
+        return f"gs://{bucket.removeprefix('gs://').rstrip('/')}/"
+
+    def search_bucket(self, bucket_url: str, prefix: str = '') -> Tuple[List[Dict[str, str]], bool]:
+        """Search a bucket (optionally under a prefix) for archive files. Returns (results, success)."""
+        # Special handling for the known bucket; the extra root listing is only worth it when debugging
         is_known_bucket = "bkt-prj-b-seed-tfstate-b052" in bucket_url
-        if is_known_bucket:
-            print(f"\nDEBUG: Found known bucket: {bucket_url}")
-            print("Attempting to list all files in this bucket...")
-            
+        if is_known_bucket and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found known bucket: %s", bucket_url)
+            logger.debug("Attempting to list all files in this bucket...")
+
             # First try a simple ls to see what's in the root
             try:
-                root_files, success = self.run_gcloud_command(["gsutil", "ls", bucket_url])
-                if success and root_files:
-                    print("Files in root directory:")
-                    for file in root_files.split('\n'):
-                        if file:
-                            print(f"  {file}")
+                root_files = self.storage_client.list_blobs(
+                    self._bucket_name(bucket_url), delimiter='/', retry=DEFAULT_RETRY
+                )
+                logger.debug("Files in root directory:")
+                for blob in root_files:
+                    logger.debug("  %s%s", bucket_url, blob.name)
             except Exception as e:
-                print(f"Error listing root files: {str(e)}")
+                logger.warning("Error listing root files: %s", e)
 
         results = []
-        # First try a broad search to see what files exist
+        # Enumerate only archive objects, fetching nothing but their names
         try:
-            print(f"    Listing all files in bucket: {bucket_url}")
-            # Try different patterns for the broad search
-            broad_patterns = [
-                f"{bucket_url}**",  # Original pattern
-                f"{bucket_url}*",   # Simple pattern
-                f"{bucket_url}**/*" # Alternative pattern
-            ]
-            
-            for pattern in broad_patterns:
-                print(f"    Trying broad pattern: {pattern}")
-                all_files, success = self.run_gcloud_command(["gsutil", "ls", "-r", pattern])
-                if success and all_files:
-                    print(f"    Found {len(all_files.split('\n'))} total files with pattern {pattern}")
-                    # Print first few files for debugging
-                    for file in all_files.split('\n')[:5]:
-                        if file:
-                            print(f"    Sample file: {file}")
-                else:
-                    print(f"    No files found with pattern {pattern} or error occurred")
+            blobs = self.storage_client.list_blobs(
+                self._bucket_name(bucket_url),
+                prefix=prefix or None,
+                match_glob=self._match_glob,
+                fields="items(name),nextPageToken",
+                retry=DEFAULT_RETRY
+            )
+            archive_filter = self._filter
+            # Cap the number of list API requests per listing; with match_glob a page may hold few or no matches
+            for page in islice(blobs.pages, self.max_pages):
+                for blob in page:
+                    file_type = archive_filter(blob.name)
+                    if file_type:
+                        results.append({
+                            'file_type': file_type,
+                            'file_path': f"{bucket_url}{blob.name}"
+                        })
+            logger.debug("    Found %d archive files in %s%s", len(results), bucket_url, prefix)
+            if blobs.next_page_token:
+                # Stopped by --max-pages with objects left, so the bucket is not fully scanned
+                logger.warning("    Stopped listing %s%s after %d pages; results are incomplete",
+                               bucket_url, prefix, self.max_pages)
+                return results, False
+        except exceptions.Forbidden:
+            # Let the caller attribute the denial to the owning project
+            raise
         except Exception as e:
-            print(f"    Error listing files: {str(e)}")
+            # Anything else (e.g. a read timeout that outlived the retries) fails this bucket, not the run
+            logger.warning("    Error searching for archive files in %s%s: %s", bucket_url, prefix, e)
+            return results, False
+        return results, True
 
-        # Now search for specific file types
-        for ext in self.archive_types:
-            try:
-                # Try different search patterns
-                patterns = [
-                    f"{bucket_url}**{ext}",    # Original pattern
-                    f"{bucket_url}*{ext}",     # Simple pattern
-                    f"{bucket_url}**/*{ext}",  # Alternative pattern
-                    f"{bucket_url}*/*{ext}",   # Another alternative
-                    f"{bucket_url}**/*.{ext}"  # Pattern with dot
-                ]
-                
-                for pattern in patterns:
-                    print(f"    Trying pattern: {pattern}")
-                    files, success = self.run_gcloud_command(["gsutil", "ls", "-r", pattern])
-                    if not success:
-                        print(f"    Error with pattern {pattern}: {files}")
-                        continue
-                    if files:
-                        print(f"    Found {len(files.split('\n'))} {ext} files with pattern {pattern}")
-                        for file_path in files.split('\n'):
-                            if file_path:
-                                results.append({
-                                    'file_type': ext[1:],  # Remove the dot
-                                    'file_path': file_path
-                                })
-                    else:
-                        print(f"    No {ext} files found with pattern {pattern}")
-            except subprocess.CalledProcessError as e:
-                print(f"    Error searching for {ext} files: {str(e)}")
-                continue
-        return results
-
-    def process_project(self, project_id: str) -> Tuple[List[Dict[str, str]], bool]:
-        """Process a single project and its buckets. Returns (results, has_permission)."""
+    def process_project(self, project_id: str) -> Tuple[List[str], bool]:
+        """List the buckets of a single project. Returns (buckets, has_permission)."""
         print(f"--- Project: {project_id} ---")
-        results = []
-        buckets, has_permission = self.get_buckets(project_id)
+        buckets = self._asset_buckets.get(project_id)
+        if buckets:
+            print(f"  Found {len(buckets)} buckets in project {project_id}")
+            has_permission = True
+        else:
+            # Fall back to listing directly for projects the asset search returned nothing for
+            buckets, has_permission = self.get_buckets(project_id)
         
         if not has_permission:
             print(f"  Permission denied for project {project_id}")
-            with open(self.errors_file, 'a') as f:
-                f.write(f"{project_id}\n")
-            return results, False
+            self._record_permission_error(project_id)
+            return [], False
         
         if not buckets:
             print(f"  No buckets found in project {project_id}")
-            return results, True
 
         for bucket_url in buckets:
-            print(f"  Scanning bucket: {bucket_url}")
-            bucket_results = self.search_bucket(bucket_url)
-            
-            for result in bucket_results:
-                results.append({
-                    'project_id': project_id,
-                    'bucket_url': bucket_url,
-                    **result
-                })
+            if bucket_url in self.skipped_buckets:
+                logger.debug("Skipping bucket: %s", bucket_url)
+        return [b for b in buckets if b not in self.skipped_buckets], True
 
-        return results, True
+    def _record_permission_error(self, project_id: str) -> None:
+        """Record a project with permission issues, once per project."""
+        with self._errors_lock:
+            self._permission_errors.setdefault(project_id, None)
+
+    def process_bucket(self, project_id: str, bucket_url: str, prefix: str = '') -> Tuple[int, bool]:
+        """Search a single bucket prefix and stream its results to the output CSV. Returns (result_count, success)."""
+        logger.debug("  Scanning bucket: %s%s", bucket_url, prefix)
+        try:
+            results, success = self.search_bucket(bucket_url, prefix)
+        except exceptions.Forbidden as e:
+            # Buckets found through Cloud Asset never went through list_buckets, so denials surface here
+            print(f"  Permission denied for bucket {bucket_url} in project {project_id}: {e.message}")
+            self._record_permission_error(project_id)
+            return 0, False
+        rows = [{'project_id': project_id, 'bucket_url': bucket_url, **result} for result in results]
+        if rows:
+            with self._writer_lock:
+                self._writer.writerows(rows)
+        return len(rows), success
+
+    def load_scanned_projects(self) -> Set[str]:
+        """Load the projects completed by previous runs from the checkpoint file."""
+        try:
+            with open(self.checkpoint_file) as f:
+                return {line.strip() for line in f if line.strip()}
+        except FileNotFoundError:
+            return set()
+
+    def prune_output(self, scanned: Set[str]) -> int:
+        """Drop output rows for projects missing from the checkpoint, since a resumed run scans them again.
+
+        Returns the number of rows dropped.
+        """
+        dropped = 0
+        tmp_file = f"{self.output_file}.tmp"
+        with open(self.output_file, newline='') as src, open(tmp_file, 'w', newline='') as dst:
+            writer = csv.DictWriter(dst, fieldnames=CSV_FIELDNAMES)
+            writer.writeheader()
+            for row in csv.DictReader(src):
+                if row.get('project_id') in scanned:
+                    writer.writerow(row)
+                else:
+                    dropped += 1
+        os.replace(tmp_file, self.output_file)
+        return dropped
 
     def run(self):
         """Main execution method."""
@@ -206,15 +307,6 @@ class ArchiveFileFinder:
         if not self.check_auth():
             sys.exit(1)
 
-        # Create output file and write header
-        with open(self.output_file, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=['project_id', 'bucket_url', 'file_type', 'file_path'])
-            writer.writeheader()
-
-        # Create empty errors file
-        with open(self.errors_file, 'w') as f:
-            f.write("# Projects with permission issues\n")
-
         # Get all projects
         projects = self.get_projects()
         if not projects:
@@ -222,27 +314,107 @@ class ArchiveFileFinder:
             return
 
         print(f"Found {len(projects)} projects")
+        if self.resume:
+            if os.path.exists(self.output_file):
+                scanned = self.load_scanned_projects()
+                dropped = self.prune_output(scanned)
+                if dropped:
+                    print(f"Resuming: dropped {dropped} rows from {self.output_file} for projects that will be rescanned")
+            else:
+                # The checkpoint is only meaningful together with the rows it vouches for
+                print(f"Resuming: {self.output_file} does not exist, so every project will be scanned")
+                scanned = set()
+            remaining_projects = [p for p in projects if p not in scanned]
+            print(f"Resuming: skipping {len(projects) - len(remaining_projects)} projects already recorded in {self.checkpoint_file}")
+            projects = remaining_projects
+            if not projects:
+                print("All projects have already been scanned.")
+                return
+        elif os.path.exists(self.checkpoint_file):
+            print(f"Starting a fresh scan; {self.checkpoint_file} will be overwritten (use --resume to continue it)")
+        self._asset_buckets = self.get_all_buckets_via_asset()
         print("Searching for archive files in buckets...")
         print("========================================")
 
-        # Process projects in parallel
-        all_results = []
-        permission_issues = 0
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            project_results = list(executor.map(self.process_project, projects))
-            for results, has_permission in project_results:
-                all_results.extend(results)
-                if not has_permission:
-                    permission_issues += 1
-
-        # Write results to file
-        with open(self.output_file, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=['project_id', 'bucket_url', 'file_type', 'file_path'])
-            writer.writerows(all_results)
+        # List buckets for all projects in parallel
+        tasks = []
+        listed_projects = []
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            futures = {executor.submit(self.process_project, p): p for p in projects}
+            for future in as_completed(futures):
+                buckets, has_permission = future.result()
+                if has_permission:
+                    listed_projects.append(futures[future])
+                tasks.extend(
+                    (futures[future], bucket_url, prefix)
+                    for bucket_url in buckets
+                    for prefix in self.prefixes
+                )
+
+        # A project is checkpointed once all of its bucket listings have completed without error
+        remaining = Counter(project_id for project_id, _, _ in tasks)
+        failed_projects: Set[str] = set()
+        owners = {}
+        completed_projects: List[str] = []
+        last_sync = time.monotonic()
+
+        def sync_checkpoint() -> None:
+            # Make sure the completed projects' rows are on disk before the checkpoint claims them
+            nonlocal last_sync
+            if completed_projects:
+                with self._writer_lock:
+                    f.flush()
+                os.fsync(f.fileno())
+                checkpoint.writelines(f"{p}\n" for p in completed_projects)
+                completed_projects.clear()
+            last_sync = time.monotonic()
+
+        def collect(future) -> int:
+            project_id = owners.pop(future)
+            count, success = future.result()
+            if not success:
+                failed_projects.add(project_id)
+            remaining[project_id] -= 1
+            if remaining[project_id] == 0 and project_id not in failed_projects:
+                completed_projects.append(project_id)
+                if (len(completed_projects) >= CHECKPOINT_BATCH_SIZE
+                        or time.monotonic() - last_sync >= CHECKPOINT_INTERVAL_SECONDS):
+                    sync_checkpoint()
+            return count
+
+        # Search every (project, bucket, prefix) in parallel, writing rows as each listing finishes
+        total_results = 0
+        # On resume, append to the pruned output so rows from previously checkpointed projects are kept
+        write_header = not (self.resume and os.path.exists(self.output_file))
+        with open(self.checkpoint_file, 'a' if self.resume else 'w', buffering=1) as checkpoint, \
+                open(self.output_file, 'a' if self.resume else 'w', newline='', buffering=1 << 20) as f:
+            checkpoint.writelines(f"{p}\n" for p in listed_projects if p not in remaining)
+            self._writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES)
+            if write_header:
+                self._writer.writeheader()
+            with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+                # Keep a bounded window of in-flight buckets instead of queueing every bucket up front
+                pending = set()
+                for project_id, bucket_url, prefix in tasks:
+                    if len(pending) >= self.parallelism * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        total_results += sum(collect(future) for future in done)
+                    future = executor.submit(self.process_bucket, project_id, bucket_url, prefix)
+                    owners[future] = project_id
+                    pending.add(future)
+                for future in as_completed(pending):
+                    total_results += collect(future)
+            sync_checkpoint()
+
+        # Write all permission failures, from bucket listing and bucket scans, in one go
+        permission_issues = len(self._permission_errors)
+        with open(self.errors_file, 'w') as f:
+            f.write("# Projects with permission issues\n")
+            f.writelines(f"{project_id}\n" for project_id in self._permission_errors)
 
         print("========================================")
         print(f"Finished searching for archive files.")
-        print(f"Found {len(all_results)} archive files.")
+        print(f"Found {total_results} archive files.")
         print(f"Found {permission_issues} projects with permission issues.")
         print(f"Results have been saved to: {self.output_file}")
         if permission_issues > 0:
@@ -252,11 +424,53 @@ def main():
     parser = argparse.ArgumentParser(description='Search for archive files in GCP organization buckets.')
     parser.add_argument('--org-id', required=True, help='Google Cloud Organization ID')
     parser.add_argument('--output', help='Output file path (optional)')
+    parser.add_argument('--parallelism', type=int, default=DEFAULT_PARALLELISM,
+                        help=f'Number of concurrent API workers (default: {DEFAULT_PARALLELISM})')
+    parser.add_argument('--prefixes', default='',
+                        help='Comma-separated object prefixes to search within each bucket (default: whole bucket)')
+    parser.add_argument('--skip-buckets', default=','.join(DEFAULT_SKIPPED_BUCKETS),
+                        help='Comma-separated buckets to skip (default: %(default)s)')
+    parser.add_argument('--max-pages', type=int,
+                        help='Maximum list API requests (result pages) per bucket prefix (optional)')
+    resume_group = parser.add_mutually_exclusive_group()
+    resume_group.add_argument('--resume', dest='resume', action='store_true',
+                              help='Skip projects already recorded in the checkpoint file by a previous run '
+                                   '(requires --output set to that run\'s CSV)')
+    resume_group.add_argument('--fresh', dest='resume', action='store_false',
+                              help='Scan every project and overwrite the checkpoint file (default)')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_FILE,
+                        help='Checkpoint file of fully scanned projects (default: %(default)s)')
+    parser.add_argument('--verbose', action='store_true', help='Log per-bucket progress and debug details')
     
     args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, format='%(message)s')
+    # Keep --verbose about this script rather than the HTTP/auth libraries underneath it
+    logging.getLogger('google').setLevel(logging.WARNING)
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+    if args.parallelism < 1:
+        parser.error('--parallelism must be at least 1')
+    if args.max_pages is not None and args.max_pages < 1:
+        parser.error('--max-pages must be at least 1')
+    if args.resume and not args.output:
+        # Without it each run gets a new timestamped file that lacks the checkpointed projects' rows
+        parser.error('--resume requires --output pointing at the CSV of the run being resumed')
     
-    finder = ArchiveFileFinder(args.org_id, args.output)
+    try:
+        finder = ArchiveFileFinder(
+            args.org_id,
+            args.output,
+            parallelism=args.parallelism,
+            prefixes=[p for p in args.prefixes.split(',') if p] or None,
+            skip_buckets=[b for b in args.skip_buckets.split(',') if b],
+            max_pages=args.max_pages,
+            resume=args.resume,
+            checkpoint_file=args.checkpoint
+        )
+    except google.auth.exceptions.DefaultCredentialsError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        print("Please run 'gcloud auth application-default login' first.", file=sys.stderr)
+        sys.exit(1)
     finder.run()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()